@@ -1,72 +1,377 @@
+import argparse
+import asyncio
+import functools
+import hashlib
+import importlib
+import io
+import json
 import os
+import re
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime
-import random
 
-import requests
-import os
-from dotenv import load_dotenv
-from crewai import Agent, Crew, Task, Process, LLM
-from crewai.tools import BaseTool
-
-# 加载配置
-load_dotenv()
+import httpx
+import numpy as np
+try:
+    import zstandard
+    _ZSTD_ERRORS = (zstandard.ZstdError,)
+except ImportError:  # 未安装zstandard时缓存报告以未压缩的jsonl保存
+    zstandard = None
+    _ZSTD_ERRORS = ()
+try:
+    from numba import njit
+except ImportError:  # 未安装numba时退回NumPy实现
+    njit = None
+
+from config import settings
 # from opensearch_client import get_opensearch_client
-from patent_crew import run_patent_analysis
+# patent_crew（crewai、litellm等）导入较慢，由main()在后台线程预加载，这里按需导入
+from embedding import get_embedding, get_embeddings_batch
 
 
 # 注释掉OpenSearch相关的搜索函数，替换为本地模拟函数
 # from patent_search_tools import hybrid_search, iterative_search, semantic_search, keyword_search
 
 
+_RNG = np.random.default_rng()
+
+# 模拟搜索结果模板（导入时构建一次，只有query、patent_id和score按次生成）
+_SEARCH_RESULT_TEMPLATES = [
+    {
+        "title": "Lithium Battery {query} Technology",
+        "abstract": "Novel {query} technology for lithium battery energy storage, improving cycle life by 30% and energy density by 25%. This patent discloses a new electrode material and manufacturing process suitable for electric vehicle applications.",
+        "publication_date": "2024-01-15",
+        "patent_id_prefix": "CN2024",
+        "score_range": (80, 99)
+    },
+    {
+        "title": "High-Efficiency {query} for Lithium-Ion Batteries",
+        "abstract": "Optimized {query} structure for lithium-ion batteries, reducing internal resistance and improving charge/discharge efficiency. Applicable to consumer electronics and energy storage systems.",
+        "publication_date": "2023-10-22",
+        "patent_id_prefix": "CN2023",
+        "score_range": (75, 89)
+    },
+    {
+        "title": "Environmental Protection {query} in Lithium Battery Production",
+        "abstract": "Green {query} technology for lithium battery production, reducing carbon emissions by 40% and waste generation by 35%. Complies with international environmental standards and reduces production costs.",
+        "publication_date": "2024-03-08",
+        "patent_id_prefix": "CN2024",
+        "score_range": (70, 85)
+    }
+]
+_SCORE_LOW, _SCORE_HIGH = np.array([t["score_range"] for t in _SEARCH_RESULT_TEMPLATES], dtype=float).T
+
+
 # 模拟搜索结果（替代OpenSearch的搜索功能）
 def mock_search_results(query):
     """模拟专利搜索结果，避免OpenSearch依赖"""
+    # 一次性生成全部随机值，代替逐条调用random
+    ids = _RNG.integers(100000, 1000000, size=len(_SEARCH_RESULT_TEMPLATES))
+    scores = _RNG.uniform(_SCORE_LOW, _SCORE_HIGH).round(2).tolist()
     mock_patents = [
         {
             "_source": {
-                "title": f"Lithium Battery {query} Technology",
-                "abstract": f"Novel {query} technology for lithium battery energy storage, improving cycle life by 30% and energy density by 25%. This patent discloses a new electrode material and manufacturing process suitable for electric vehicle applications.",
-                "publication_date": "2024-01-15",
-                "patent_id": f"CN2024{random.randint(100000, 999999)}"
+                "title": template["title"].format(query=query),
+                "abstract": template["abstract"].format(query=query),
+                "publication_date": template["publication_date"],
+                "patent_id": f"{template['patent_id_prefix']}{patent_id}"
             },
-            "_score": round(random.uniform(80, 99), 2)
-        },
-        {
-            "_source": {
-                "title": f"High-Efficiency {query} for Lithium-Ion Batteries",
-                "abstract": f"Optimized {query} structure for lithium-ion batteries, reducing internal resistance and improving charge/discharge efficiency. Applicable to consumer electronics and energy storage systems.",
-                "publication_date": "2023-10-22",
-                "patent_id": f"CN2023{random.randint(100000, 999999)}"
-            },
-            "_score": round(random.uniform(75, 89), 2)
-        },
-        {
-            "_source": {
-                "title": f"Environmental Protection {query} in Lithium Battery Production",
-                "abstract": f"Green {query} technology for lithium battery production, reducing carbon emissions by 40% and waste generation by 35%. Complies with international environmental standards and reduces production costs.",
-                "publication_date": "2024-03-08",
-                "patent_id": f"CN2024{random.randint(100000, 999999)}"
-            },
-            "_score": round(random.uniform(70, 85), 2)
+            "_score": score
         }
+        for template, patent_id, score in zip(_SEARCH_RESULT_TEMPLATES, ids, scores)
     ]
     return mock_patents
 
 
+def _nn_argmax_numpy(M, q):
+    scores = M @ q
+    i = int(np.argmax(scores))
+    return i, float(scores[i])
+
+
+if njit is not None:
+    @njit(cache=True, fastmath=True)
+    def _nn_argmax_numba(M, q):
+        # 逐行点积并同时求argmax，不生成中间的scores数组
+        best_i, best = -1, -1e30
+        for i in range(M.shape[0]):
+            s = 0.0
+            for k in range(M.shape[1]):
+                s += M[i, k] * q[k]
+            if s > best:
+                best, best_i = s, i
+        return best_i, best
+
+    # 导入时先编译一次（cache=True时后续启动直接读取磁盘缓存），避免首次查询的JIT延迟
+    _nn_argmax_numba(np.zeros((1, 768), dtype=np.float32), np.zeros(768, dtype=np.float32))
+    nn_argmax = _nn_argmax_numba
+else:
+    nn_argmax = _nn_argmax_numpy
+
+
+def simhash64(text):
+    """64位SimHash：按词做加权投票，相近的文本得到汉明距离很小的指纹"""
+    votes = [0] * 64
+    for token in re.findall(r"\w+", text.lower()):
+        h = int.from_bytes(hashlib.blake2b(token.encode("utf-8"), digest_size=8).digest(), "little")
+        for i in range(64):
+            votes[i] += 1 if (h >> i) & 1 else -1
+    return sum(1 << i for i, v in enumerate(votes) if v > 0)
+
+
+class SimLRU:
+    """按research_area的embedding做相似度匹配的LRU缓存（最近使用的条目在最前）"""
+
+    def __init__(self, capacity=128, threshold=0.92, max_hamming=3, path="cache"):
+        self.capacity = capacity
+        self.threshold = threshold
+        self.max_hamming = max_hamming
+        self.matrix_path = f"{path}.npz"
+        self.entries_path = f"{path}.jsonl.zst" if zstandard is not None else f"{path}.jsonl"
+        self.M = None  # (C, d) 已归一化的embedding矩阵，行顺序与entries一致
+        self.entries = []  # [{"research_area", "simhash", "report", "timestamp"}]
+        self._simhash_index = {}  # simhash -> entries中的下标，用于精确匹配
+        self._lock = threading.Lock()  # 批量模式下多个线程共用同一缓存
+        self._load()
+
+    @staticmethod
+    def _normalize(vec):
+        vec = np.asarray(vec, dtype=np.float32)
+        norm = np.linalg.norm(vec)
+        return vec / norm if norm else vec
+
+    def get_fuzzy(self, simhash):
+        """不调用embedding模型的快速路径：先精确匹配SimHash，再找汉明距离 <= max_hamming的条目"""
+        with self._lock:
+            i = self._simhash_index.get(simhash)
+            if i is None:
+                for j, entry in enumerate(self.entries):
+                    if (simhash ^ entry["simhash"]).bit_count() <= self.max_hamming:
+                        i = j
+                        break
+            if i is None:
+                return None
+            self._move_to_front(i)
+            return self.entries[0]["report"]
+
+    def get(self, embedding):
+        """返回最相似条目的报告（余弦相似度 >= threshold），否则返回None"""
+        q = self._normalize(embedding)
+        with self._lock:
+            if self.M is None or not self.entries:
+                return None
+            if q.shape[0] != self.M.shape[1]:
+                return None
+            i, score = nn_argmax(self.M, q)
+            if score < self.threshold:
+                return None
+            self._move_to_front(i)
+            return self.entries[0]["report"]
+
+    def put(self, embedding, research_area, report):
+        """插入新条目到最前，超出容量时淘汰最久未使用的条目"""
+        q = self._normalize(embedding)
+        entry = {
+            "research_area": research_area,
+            "simhash": simhash64(research_area),
+            "report": report,
+            "timestamp": datetime.now().isoformat(),
+        }
+        with self._lock:
+            if self.M is not None and q.shape[0] != self.M.shape[1]:
+                # embedding模型变化导致维度不一致，旧缓存作废
+                self.M, self.entries = None, []
+            self.entries.insert(0, entry)
+            self.M = q[None, :] if self.M is None else np.vstack([q, self.M])
+            del self.entries[self.capacity:]
+            self.M = self.M[:self.capacity]
+            self._reindex()
+            self._save()
+
+    def _move_to_front(self, i):
+        if i == 0:
+            return
+        order = [i] + [j for j in range(len(self.entries)) if j != i]
+        self.M = self.M[order]
+        self.entries = [self.entries[j] for j in order]
+        # 命中只调整内存中的顺序，不重写磁盘文件；新的顺序在下一次put时一起持久化
+        self._reindex()
+
+    def _reindex(self):
+        # 倒序写入，SimHash相同时保留最近使用的条目
+        self._simhash_index = {
+            entry["simhash"]: i for i, entry in reversed(list(enumerate(self.entries)))
+        }
+
+    def _save(self):
+        # embedding以fp16落盘（体积减半，精度远高于0.92阈值的需要），报告用zstd压缩
+        lines = (json.dumps(entry, ensure_ascii=False) + "\n" for entry in self.entries)
+        try:
+            np.savez(self.matrix_path, M=self.M.astype(np.float16))
+            if zstandard is not None:
+                with open(self.entries_path, "wb") as raw, \
+                        zstandard.ZstdCompressor(level=3).stream_writer(raw) as f:
+                    for line in lines:
+                        f.write(line.encode("utf-8"))
+            else:
+                with open(self.entries_path, "w", encoding="utf-8") as f:
+                    f.writelines(lines)
+        except (OSError, *_ZSTD_ERRORS) as e:
+            print(f"Similarity cache save failed - {e}")
+
+    def _load(self):
+        if not (os.path.exists(self.matrix_path) and os.path.exists(self.entries_path)):
+            return
+        try:
+            with np.load(self.matrix_path) as data:
+                M = data["M"].astype(np.float32)  # 相似度计算仍使用float32
+            if zstandard is not None:
+                with open(self.entries_path, "rb") as raw, \
+                        zstandard.ZstdDecompressor().stream_reader(raw) as reader:
+                    f = io.TextIOWrapper(reader, encoding="utf-8")
+                    entries = [json.loads(line) for line in f if line.strip()]
+            else:
+                with open(self.entries_path, "r", encoding="utf-8") as f:
+                    entries = [json.loads(line) for line in f if line.strip()]
+        except (OSError, ValueError, KeyError, *_ZSTD_ERRORS) as e:
+            print(f"Similarity cache load failed - {e}")
+            return
+        if len(entries) != M.shape[0]:
+            print("Similarity cache files are inconsistent, ignoring cache.")
+            return
+        for entry in entries:
+            entry.setdefault("simhash", simhash64(entry["research_area"]))
+        self.M = M[:self.capacity]
+        self.entries = entries[:self.capacity]
+        self._reindex()
+
+
+# 相似查询（如"Lithium Battery"与"lithium batteries"）直接复用已生成的报告
+# 每个模型单独一份缓存，避免把一个模型生成的报告返回给使用另一个模型的请求
+_ANALYSIS_CACHES = {}
+_ANALYSIS_CACHES_LOCK = threading.Lock()
+
+
+def _get_analysis_cache(model_name):
+    """返回model_name对应的相似度缓存（首次使用时从磁盘加载）"""
+    with _ANALYSIS_CACHES_LOCK:
+        if model_name not in _ANALYSIS_CACHES:
+            slug = re.sub(r"\W+", "_", model_name).strip("_").lower()
+            _ANALYSIS_CACHES[model_name] = SimLRU(capacity=128, path=f"cache_{slug}")
+        return _ANALYSIS_CACHES[model_name]
+
+
+def cached_patent_analysis(research_area, model_name="deepseek-chat", stream=None):
+    """在run_patent_analysis前加一层相似度缓存"""
+    from patent_crew import run_patent_analysis
+
+    cache = _get_analysis_cache(model_name)
+    # 几乎相同的输入（大小写、标点不同）直接命中SimHash，不必调用embedding模型
+    cached = cache.get_fuzzy(simhash64(research_area))
+    if cached is not None:
+        print("Found a cached analysis for the same research area, reusing it.")
+        return cached
+
+    try:
+        q = get_embeddings_batch([research_area])[0]
+    except Exception as e:
+        print(f"Similarity cache skipped - {e}")
+        return run_patent_analysis(research_area, model_name, stream)
+    if not q:
+        return run_patent_analysis(research_area, model_name, stream)
+
+    cached = cache.get(q)
+    if cached is not None:
+        print("Found a cached analysis for a similar research area, reusing it.")
+        return cached
+
+    result = run_patent_analysis(research_area, model_name, stream)
+    if getattr(result, "partial", False):
+        # 有趋势分析子任务失败的报告不完整，不缓存，下次相似查询重新分析
+        print("Analysis is incomplete (some trend sub-tasks failed); not caching this report.")
+        return result
+    cache.put(q, research_area, result)
+    return result
+
+
+SEP = "-" * 60
+BANNER = "=" * 60
+
+# 菜单文本只拼接一次，每次显示只需一次write
+_MENU = (
+    "\n" + BANNER + "\n"
+    "  PATENT INNOVATION PREDICTOR - LITHIUM BATTERY TECHNOLOGY  \n"
+    + BANNER + "\n"
+    "1. Run complete patent trend analysis and forecasting\n"
+    "2. Search for specific patents (mock data)\n"
+    "3. Iterative patent exploration (mock data)\n"
+    "4. View system status (skip OpenSearch check)\n"
+    "5. Exit\n"
+    + SEP + "\n"
+)
+
+
 def display_menu():
     """Display the main menu options"""
-    print("\n" + "=" * 60)
-    print("  PATENT INNOVATION PREDICTOR - LITHIUM BATTERY TECHNOLOGY  ")
-    print("=" * 60)
-    print("1. Run complete patent trend analysis and forecasting")
-    print("2. Search for specific patents (mock data)")
-    print("3. Iterative patent exploration (mock data)")
-    print("4. View system status (skip OpenSearch check)")
-    print("5. Exit")
-    print("-" * 60)
+    sys.stdout.write(_MENU)
     return input("Select an option (1-5): ")
 
 
+def save_patent_analysis(research_area, model_name="deepseek-chat", filename=None):
+    """运行分析，把中间步骤和最终报告写入文件，返回(文件名, 最终报告)"""
+    if filename is None:
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        filename = f"patent_analysis_{timestamp}.txt"
+
+    # 分析过程实时写入文件（行缓冲），可以用 tail -f 查看进度
+    print(f"Streaming progress to {filename}")
+    try:
+        with open(filename, "w", encoding="utf-8", buffering=1) as f:  # 添加编码避免中文乱码
+            result = cached_patent_analysis(research_area, model_name, stream=f)
+            f.write(result)
+    except BaseException:
+        # 分析失败（含Ctrl+C）时删除只写了一半的文件，与原来失败时不产生文件的行为一致
+        if os.path.exists(filename):
+            os.remove(filename)
+        raise
+
+    return filename, result
+
+
+def run_batch_analysis(research_areas, parallel=1, model_name="deepseek-chat"):
+    """并发分析多个research_area（LLM调用是I/O密集型，使用线程池）"""
+    # 去掉重复的研究领域；文件名带序号，slug相同的领域（如"Li-ion"和"Li ion"）也不会写同一个文件
+    research_areas = list(dict.fromkeys(research_areas))
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    print(f"Analyzing {len(research_areas)} research areas with {parallel} parallel workers...")
+
+    # 先在主线程导入一次crewai/litellm，避免多个工作线程同时首次导入出现"partially initialized module"错误
+    try:
+        importlib.import_module("patent_crew")
+    except Exception as e:
+        print(f"❌ Failed to load the analysis pipeline: {e}")
+        return
+
+    def analyze(index, research_area):
+        slug = re.sub(r"\W+", "_", research_area).strip("_").lower()
+        filename, _ = save_patent_analysis(research_area, model_name, f"patent_analysis_{index}_{slug}_{timestamp}.txt")
+        return filename
+
+    with ThreadPoolExecutor(max_workers=parallel) as executor:
+        futures = {
+            executor.submit(analyze, index, area): area
+            for index, area in enumerate(research_areas, start=1)
+        }
+        for future in as_completed(futures):
+            area = futures[future]
+            try:
+                print(f"✅ {area}: Analysis saved to {future.result()}")
+            except Exception as e:
+                print(f"❌ {area}: Error during analysis: {e}")
+
+
 def run_complete_analysis():
     """Run the complete patent trend analysis using CrewAI agents"""
     print("\nRunning comprehensive patent analysis...")
@@ -84,24 +389,13 @@ def run_complete_analysis():
     print("Agents are now processing the data...\n")
 
     try:
-        result = run_patent_analysis(research_area, model_name)
-
-        # Ensure result is a string before writing to file
-        if not isinstance(result, str):
-            result = str(result)
-
-        # Save results to file
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        filename = f"patent_analysis_{timestamp}.txt"
-        with open(filename, "w", encoding="utf-8") as f:  # 添加编码避免中文乱码
-            f.write(result)
-
+        filename, result = save_patent_analysis(research_area, model_name)
         print(f"\nAnalysis completed and saved to {filename}")
 
         # Display summary
-        print("\n" + "=" * 60)
+        print("\n" + BANNER)
         print("ANALYSIS SUMMARY")
-        print("-" * 60)
+        print(SEP)
         print(result[:500] + "...\n")  # Display first 500 chars
 
     except Exception as e:
@@ -109,10 +403,25 @@ def run_complete_analysis():
         print("Tips: Ensure your .env file has the correct OPENAI_API_KEY for DeepSeek and you have an internet connection.")
 
 
+def _display_hits(results, show_score=True):
+    """打印搜索结果；截断后的摘要缓存在_source上，重复显示时直接复用"""
+    for i, hit in enumerate(results):
+        source = hit["_source"]
+        if "_abstract_short" not in source:
+            source["_abstract_short"] = source["abstract"][:150]
+        print(f"{i + 1}. {source['title']}")
+        if show_score:
+            print(f"   Score: {hit['_score']}")
+        print(f"   Date: {source.get('publication_date', 'N/A')}")
+        print(f"   Patent ID: {source.get('patent_id', 'N/A')}")
+        print(f"   Abstract: {source['_abstract_short']}...")
+        print(SEP)
+
+
 def search_patents():
     """Search for specific patents (mock data, no OpenSearch)"""
     print("\nPATENT SEARCH (MOCK DATA)")
-    print("-" * 60)
+    print(SEP)
 
     query = input("Enter search query: ")
     if not query:
@@ -135,15 +444,8 @@ def search_patents():
         }.get(search_type, "Hybrid")
 
         print(f"\n[{search_type_name} Search] Found {len(results)} results for '{query}':")
-        print("-" * 60)
-        for i, hit in enumerate(results):
-            source = hit["_source"]
-            print(f"{i + 1}. {source['title']}")
-            print(f"   Score: {hit['_score']}")
-            print(f"   Date: {source.get('publication_date', 'N/A')}")
-            print(f"   Patent ID: {source.get('patent_id', 'N/A')}")
-            print(f"   Abstract: {source['abstract'][:150]}...")
-            print("-" * 60)
+        print(SEP)
+        _display_hits(results)
 
     except Exception as e:
         print(f"Search error: {e}")
@@ -152,7 +454,7 @@ def search_patents():
 def iterative_exploration():
     """Perform iterative exploration of patents (mock data)"""
     print("\nITERATIVE PATENT EXPLORATION (MOCK DATA)")
-    print("-" * 60)
+    print(SEP)
 
     query = input("Enter initial exploration query: ")
     if not query:
@@ -176,60 +478,85 @@ def iterative_exploration():
             hit["_score"] = round(hit["_score"] * (1 + steps * 0.1), 2)
 
         print(f"\nFound {len(results)} results through iterative exploration:")
-        print("-" * 60)
-        for i, hit in enumerate(results):
-            source = hit["_source"]
-            print(f"{i + 1}. {source['title']}")
-            print(f"   Date: {source.get('publication_date', 'N/A')}")
-            print(f"   Patent ID: {source.get('patent_id', 'N/A')}")
-            print(f"   Abstract: {source['abstract'][:150]}...")
-            print("-" * 60)
+        print(SEP)
+        _display_hits(results, show_score=False)
 
     except Exception as e:
         print(f"Exploration error: {e}")
 
 
+# 状态检查专用的轻量HTTP客户端，不需要导入crewai/litellm
+_PROBE_CLIENT = httpx.Client(timeout=5)
+
+
+def _probe_deepseek():
+    """探测DeepSeek API可达性，返回HTTP状态码"""
+    # HEAD避免下载整个首页，不支持时回退到GET
+    response = _PROBE_CLIENT.head(settings.deepseek_base_url)
+    if response.status_code == 405:
+        response = _PROBE_CLIENT.get(settings.deepseek_base_url)
+    return response.status_code
+
+
+@functools.lru_cache(maxsize=1)
+def _embedding_sample():
+    """只在第一次成功时调用embedding模型，之后的状态检查直接复用（失败不缓存，下次重试）"""
+    return get_embedding("test")
+
+
+def _probe_embedding():
+    """探测embedding模型，返回向量维度"""
+    return len(_embedding_sample())
+
+
+async def _run_status_probes():
+    # 网络探测和embedding探测互不依赖，并发执行
+    return await asyncio.gather(
+        asyncio.to_thread(_probe_deepseek),
+        asyncio.to_thread(_probe_embedding),
+        return_exceptions=True
+    )
+
+
 def check_system_status():
     """Check the status of system components"""
     print("\nSYSTEM STATUS")
-    print("-" * 60)
+    print(SEP)
+    api_key = settings.openai_api_key
+    status_code, dimension = asyncio.run(_run_status_probes())
+
     # 检查环境变量
-    api_key = os.getenv("OPENAI_API_KEY")
     if api_key:
         print("✅ DeepSeek API Key: Loaded from .env file.")
     else:
         print("❌ DeepSeek API Key: Not found. Please check your .env file.")
     # 检查到 DeepSeek API 的网络连接
-    try:
-        response = requests.get("https://api.deepseek.com", timeout=5)
-        if response.status_code < 400: # 任何成功的状态码
-             print("✅ DeepSeek API Connection: OK (Network reachable)")
-        else:
-            print(f"❌ DeepSeek API Connection: Failed (Status code: {response.status_code})")
-    except requests.exceptions.RequestException as e:
-        print(f"❌ DeepSeek API Connection: Failed - {e}")
+    if isinstance(status_code, BaseException):
+        print(f"❌ DeepSeek API Connection: Failed - {status_code}")
         print("   Tips: Check your internet connection.")
+    elif status_code < 400: # 任何成功的状态码
+        print("✅ DeepSeek API Connection: OK (Network reachable)")
+    else:
+        print(f"❌ DeepSeek API Connection: Failed (Status code: {status_code})")
     print("\nSystem is ready for operation.")
 
     # Check embedding model (简化检查)
-    try:
-        from embedding import get_embedding
-        sample = get_embedding("test")
-        print(f"✅ Embedding model: OK (dimension: {len(sample)})")
-    except Exception as e:
-        print(f"ℹ️ Embedding model: Check skipped - {e}")
+    if isinstance(dimension, BaseException):
+        print(f"ℹ️ Embedding model: Check skipped - {dimension}")
+    else:
+        print(f"✅ Embedding model: OK (dimension: {dimension})")
 
     print("\nSystem is ready for operation (using mock data for search functions).")
 
 
 def main():
     """Main application entry point"""
-    # Load environment variables (still useful for other potential secrets)
-    load_dotenv()
-
     print("Welcome to Patent Innovation Predictor!")
     print("Note: Using mock data for search functions (no OpenSearch required)")
 
+    # 用户阅读菜单时在后台导入crewai/litellm，选项1首次运行不再等待导入
+    threading.Thread(target=importlib.import_module, args=("patent_crew",), daemon=True).start()
+
     while True:
         choice = display_menu()
 
@@ -250,5 +577,39 @@ def main():
         input("\nPress Enter to continue...")
 
 
+def _positive_int(value):
+    """argparse类型：正整数"""
+    try:
+        number = int(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid int value: '{value}'")
+    if number < 1:
+        raise argparse.ArgumentTypeError(f"must be a positive integer, got {number}")
+    return number
+
+
+def parse_args(argv=None):
+    """Parse command line arguments for non-interactive batch mode"""
+    parser = argparse.ArgumentParser(description="Patent Innovation Predictor")
+    parser.add_argument(
+        "--areas",
+        nargs="+",
+        help='Research areas to analyze without the interactive menu, e.g. --areas "Lithium Battery,Sodium Ion"'
+    )
+    parser.add_argument(
+        "--parallel",
+        type=_positive_int,
+        default=1,
+        help="Number of analyses to run concurrently (default: 1)"
+    )
+    return parser.parse_args(argv)
+
+
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    args = parse_args()
+    if args.areas:
+        # 同时支持空格分隔和逗号分隔的多个研究领域
+        areas = [area.strip() for item in args.areas for area in item.split(",") if area.strip()]
+        run_batch_analysis(areas, args.parallel)
+    else:
+        main()
\ No newline at end of file
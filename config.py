@@ -0,0 +1,22 @@
+from pathlib import Path
+from typing import Optional
+
+from pydantic_settings import BaseSettings, SettingsConfigDict
+
+
+class Settings(BaseSettings):
+    """应用配置：进程启动时从环境变量和.env读取一次"""
+
+    # .env与本文件同目录，不依赖当前工作目录
+    model_config = SettingsConfigDict(
+        env_file=Path(__file__).resolve().with_name(".env"),
+        env_file_encoding="utf-8",
+        extra="ignore"
+    )
+
+    # DeepSeek API Key（沿用OpenAI兼容的变量名）
+    openai_api_key: Optional[str] = None
+    deepseek_base_url: str = "https://api.deepseek.com"
+
+
+settings = Settings()
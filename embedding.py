@@ -18,6 +18,38 @@ def get_embedding(prompt, model="nomic-embed-text"):
         )
 
 
+def get_embeddings_batch(texts, model="nomic-embed-text", batch_size=64, timeout=10):
+    """
+    Embed several texts with one request per batch instead of one per text.
+
+    Args:
+        texts (list): Texts to embed
+        model (str): Embedding model name
+        batch_size (int): Maximum number of texts sent in a single request
+        timeout (float): Seconds to wait for each request before giving up
+
+    Returns:
+        list: One embedding per input text, in the same order
+    """
+    url = "http://localhost:11434/api/embed"
+    headers = {"Content-Type": "application/json"}
+    embeddings = []
+
+    for start in range(0, len(texts), batch_size):
+        batch = texts[start:start + batch_size]
+        data = {"input": batch, "model": model}
+
+        response = requests.post(url, headers=headers, json=data, timeout=timeout)
+
+        if response.status_code != 200:
+            raise Exception(
+                f"Error fetching embeddings: {response.status_code}, {response.text}"
+            )
+        embeddings.extend(response.json().get("embeddings", []))
+
+    return embeddings
+
+
 if __name__ == "__main__":
     sample_prompt = "The sky is blue because of Rayleigh scattering."
     try:
@@ -1,53 +1,74 @@
-import os
+import asyncio
+import functools
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-from typing import List, Optional
+from types import MappingProxyType
+from typing import Callable, List, Optional, TextIO
 
 # 适配CrewAI 0.28.8 + Ollama
 from crewai import Agent, Crew, Task, Process, LLM
 from crewai.tools import BaseTool
-from dotenv import load_dotenv
 # 引入ChatOllama显式配置本地模型
 # from langchain_ollama import ChatOllama
 
+from config import settings
+
+
+# 模拟专利数据模板（导入时构建一次，只有research_area需要填充）
+_MOCK_PATENT_TEMPLATES = [
+    {
+        "title": "{ra} Electrode Material Optimization",
+        "abstract": "Novel electrode material for {ra} applications, improving cycle life by 35% and energy density by 28%. The material uses nanocomposite technology and is suitable for high-performance EV batteries.",
+        "publication_date": "2024-01-15",
+        "inventor": "Zhang San",
+        "assignee": "Battery Tech Co., Ltd.",
+        "tech_field": "Electrode Materials"
+    },
+    {
+        "title": "{ra} Thermal Management System",
+        "abstract": "Intelligent thermal management system for {ra} packs, reducing operating temperature by 15°C and improving safety by 40%. Integrated with AI-based temperature prediction algorithms.",
+        "publication_date": "2024-02-20",
+        "inventor": "Li Si",
+        "assignee": "New Energy Auto Group",
+        "tech_field": "Thermal Management"
+    },
+    {
+        "title": "{ra} Recycling Technology",
+        "abstract": "Eco-friendly {ra} recycling process, recovering 98% of lithium and cobalt materials. Reduces environmental impact and raw material costs by 30%.",
+        "publication_date": "2024-03-10",
+        "inventor": "Wang Wu",
+        "assignee": "Recycling Tech Inc.",
+        "tech_field": "Recycling & Sustainability"
+    },
+    {
+        "title": "{ra} Solid-State Battery Design",
+        "abstract": "Next-generation solid-state {ra} design, eliminating liquid electrolyte and improving energy density by 50%. Achieves 1000+ charge/discharge cycles with no safety risks.",
+        "publication_date": "2024-04-05",
+        "inventor": "Zhao Liu",
+        "assignee": "Advanced Battery Lab",
+        "tech_field": "Solid-State Batteries"
+    }
+]
+
 
 # 模拟专利数据生成（避免外部依赖）
+# Agent在ReAct循环中会重复调用工具，按research_area缓存，只读结构可安全共享
+@functools.lru_cache(maxsize=64)
+def _build_mock_patent_data_cached(research_area: str) -> tuple:
+    return tuple(
+        MappingProxyType({
+            **template,
+            "title": template["title"].format(ra=research_area),
+            "abstract": template["abstract"].format(ra=research_area)
+        })
+        for template in _MOCK_PATENT_TEMPLATES
+    )
+
+
 def generate_mock_patent_data(research_area: str) -> List[dict]:
     """生成模拟专利数据，用于分析"""
-    mock_data = [
-        {
-            "title": f"{research_area} Electrode Material Optimization",
-            "abstract": f"Novel electrode material for {research_area} applications, improving cycle life by 35% and energy density by 28%. The material uses nanocomposite technology and is suitable for high-performance EV batteries.",
-            "publication_date": "2024-01-15",
-            "inventor": "Zhang San",
-            "assignee": "Battery Tech Co., Ltd.",
-            "tech_field": "Electrode Materials"
-        },
-        {
-            "title": f"{research_area} Thermal Management System",
-            "abstract": f"Intelligent thermal management system for {research_area} packs, reducing operating temperature by 15°C and improving safety by 40%. Integrated with AI-based temperature prediction algorithms.",
-            "publication_date": "2024-02-20",
-            "inventor": "Li Si",
-            "assignee": "New Energy Auto Group",
-            "tech_field": "Thermal Management"
-        },
-        {
-            "title": f"{research_area} Recycling Technology",
-            "abstract": f"Eco-friendly {research_area} recycling process, recovering 98% of lithium and cobalt materials. Reduces environmental impact and raw material costs by 30%.",
-            "publication_date": "2024-03-10",
-            "inventor": "Wang Wu",
-            "assignee": "Recycling Tech Inc.",
-            "tech_field": "Recycling & Sustainability"
-        },
-        {
-            "title": f"{research_area} Solid-State Battery Design",
-            "abstract": f"Next-generation solid-state {research_area} design, eliminating liquid electrolyte and improving energy density by 50%. Achieves 1000+ charge/discharge cycles with no safety risks.",
-            "publication_date": "2024-04-05",
-            "inventor": "Zhao Liu",
-            "assignee": "Advanced Battery Lab",
-            "tech_field": "Solid-State Batteries"
-        }
-    ]
-    return mock_data
+    return [dict(patent) for patent in _build_mock_patent_data_cached(research_area)]
 
 
 # 修复Tool类定义（适配CrewAI 0.28.8 + Pydantic V1）
@@ -65,88 +86,182 @@ class PatentSearchTool(BaseTool):
         return ["research_area"]
 
 
-def run_patent_analysis(research_area: str, model_name: str = "deepseek-chat") -> str:
-    """
-    运行专利分析（基于CrewAI agents，使用Ollama模型）
+# 趋势分析子任务：互相独立，仅依赖研究员的输出，可并行执行
+TREND_FOCUSES = {
+    "emerging-tech": "emerging technologies and technical breakthroughs",
+    "top-innovators": "top innovators, leading assignees and market opportunities",
+    "performance-improvements": "performance improvements (energy density, cycle life, safety) and their timeline",
+}
+
+
+def _stream_writer(stream: TextIO) -> Callable:
+    """把Agent的执行步骤实时写入文件（并行子任务共用一把锁）
+    只作为Agent的step_callback使用：最终答案已包含在AgentFinish步骤中，Task不再注册callback以免重复写入
     """
-    # 加载环境变量
-    load_dotenv()
+    lock = threading.Lock()
+
+    def write(output):
+        with lock:
+            stream.write(f"{output}\n")
 
+    return write
+
+
+@functools.lru_cache(maxsize=4)
+def _get_llm(model_name: str) -> LLM:
+    """每个模型只创建一次LLM对象，多次分析之间复用"""
     # 核心修复：显式配置Ollama LLM（替代字符串配置）
-    llm = LLM(
+    return LLM(
         model=model_name,
-        api_key=os.getenv("OPENAI_API_KEY"),
-        base_url="https://api.deepseek.com"
+        api_key=settings.openai_api_key,
+        base_url=settings.deepseek_base_url
     )
 
+
+# Agent和Task的文本中research_area使用CrewAI的{research_area}占位符，
+# 由kickoff(inputs=...)填充。Task会保存自身的执行输出并作为下游任务的context，
+# 并行子任务和批量分析同时运行时不能共享，因此每次分析仍创建新的Agent/Task实例。
+def _create_trend_analyst(llm: LLM, on_output: Optional[Callable] = None) -> Agent:
+    """创建技术趋势分析师（每个并行子任务使用独立实例，避免共享Agent状态）"""
+    return Agent(
+        role="Technology Trend Analyst",
+        goal="Identify key trends and forecasting in {research_area} patents",
+        backstory="Data scientist specializing in emerging technology trends. Expert in predicting market adoption and technical breakthroughs.",
+        verbose=True,
+        allow_delegation=False,
+        llm=llm,
+        step_callback=on_output
+    )
+
+
+def _kickoff(agents: List[Agent], tasks: List[Task], research_area: str):
+    """用单独的Crew执行一组任务（CrewAI的kickoff是阻塞调用）"""
+    crew = Crew(
+        agents=agents,
+        tasks=tasks,
+        process=Process.sequential,
+        verbose=True  # 显示详细执行过程
+    )
+    return crew.kickoff(inputs={"research_area": research_area})
+
+
+# CrewAI的Agent在kickoff内部同步调用LLM.call，kickoff_async本身也只是把kickoff放进线程，
+# 阻塞线程无法省掉；改为所有分析共用一个有界线程池，批量并发时线程数不随分析数量增长
+_CREW_EXECUTOR = ThreadPoolExecutor(max_workers=8, thread_name_prefix="crew")
+
+
+async def _kickoff_async(agents: List[Agent], tasks: List[Task], research_area: str):
+    """在共享线程池中执行_kickoff"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_CREW_EXECUTOR, _kickoff, agents, tasks, research_area)
+
+
+async def _run_pipeline(research_area: str, llm: LLM, on_output: Optional[Callable] = None):
+    """
+    按依赖关系执行任务：研究员 -> 并行趋势分析子任务 -> 报告撰写人
+    """
     # 1. 创建Agent：专利研究员
     patent_researcher = Agent(
         role="Senior Patent Researcher",
-        goal=f"Collect and analyze the latest {research_area} patent data",
+        goal="Collect and analyze the latest {research_area} patent data",
         backstory="Expert in patent analysis with 10+ years of experience in battery technology. Specializes in identifying technical trends and innovation opportunities.",
         verbose=True,
         allow_delegation=False,
         tools=[PatentSearchTool()],
-        llm=llm  # 传入配置好的LLM对象
-    )
-
-    # 2. 创建Agent：技术趋势分析师
-    trend_analyst = Agent(
-        role="Technology Trend Analyst",
-        goal=f"Identify key trends and forecasting in {research_area} patents",
-        backstory="Data scientist specializing in emerging technology trends. Expert in predicting market adoption and technical breakthroughs.",
-        verbose=True,
-        allow_delegation=False,
-        llm=llm
+        llm=llm,  # 传入配置好的LLM对象
+        step_callback=on_output
     )
 
-    # 3. 创建Agent：报告撰写人
+    # 2. 创建Agent：报告撰写人
     report_writer = Agent(
         role="Technical Report Writer",
-        goal=f"Compile a comprehensive analysis report for {research_area} patents",
+        goal="Compile a comprehensive analysis report for {research_area} patents",
         backstory="Professional technical writer with experience in battery technology reports. Skilled at translating complex data into clear insights.",
         verbose=True,
         allow_delegation=False,
         llm=llm
+        # 不注册step_callback：撰写人的最终步骤就是报告本身，由调用方统一写入一次
     )
 
-    # 4. 创建任务1：收集专利数据
+    # 3. 任务1：收集专利数据（其余任务都依赖它，同步执行）
     task1 = Task(
-        description=f"Search for the latest {research_area} patents (2023-2024) and extract key information: title, abstract, technical field, publication date, innovation points.",
+        description="Search for the latest {research_area} patents (2023-2024) and extract key information: title, abstract, technical field, publication date, innovation points.",
         agent=patent_researcher,
-        expected_output="List of 4+ patents with detailed technical information and innovation highlights.",
-        inputs={"research_area": research_area}
+        expected_output="List of 4+ patents with detailed technical information and innovation highlights."
     )
+    _kickoff([patent_researcher], [task1], research_area)
 
-    # 5. 创建任务2：分析技术趋势
-    task2 = Task(
-        description=f"Analyze the patent data to identify key technical trends in {research_area} field: emerging technologies, top innovators, performance improvements, market opportunities.",
-        agent=trend_analyst,
-        expected_output="Detailed trend analysis with data-backed insights and 3-5 key findings."
-    )
+    # 4. 趋势分析子任务：并行执行，墙钟时间接近最慢的一个而不是总和
+    trend_tasks = []
+    futs = []
+    for focus, detail in TREND_FOCUSES.items():
+        trend_analyst = _create_trend_analyst(llm, on_output)
+        task = Task(
+            description=f"Analyze the patent data to identify {detail} in the {{research_area}} field.",
+            agent=trend_analyst,
+            expected_output=f"Focused trend analysis on {focus} with data-backed insights and 1-2 key findings.",
+            context=[task1]
+        )
+        trend_tasks.append(task)
+        futs.append(_kickoff_async([trend_analyst], [task], research_area))
+
+    results = await asyncio.gather(*futs, return_exceptions=True)
 
-    # 6. 创建任务3：撰写分析报告
+    completed = []
+    failed = []
+    for focus, task, outcome in zip(TREND_FOCUSES, trend_tasks, results):
+        if isinstance(outcome, BaseException):
+            print(f"Trend sub-task '{focus}' failed: {outcome}")
+            failed.append(focus)
+        else:
+            completed.append(task)
+    if not completed:
+        raise RuntimeError("All trend analysis sub-tasks failed.")
+
+    # 5. 任务3：汇总研究员和趋势分析结果，撰写分析报告
     task3 = Task(
-        description=f"Compile a comprehensive patent analysis report for {research_area} technology, including executive summary, technical trends, innovation opportunities, and future forecasting (next 3-5 years).",
+        description="Compile a comprehensive patent analysis report for {research_area} technology, including executive summary, technical trends, innovation opportunities, and future forecasting (next 3-5 years).",
         agent=report_writer,
-        expected_output="Full analysis report in natural language, professional and easy to understand, 800-1000 words."
+        expected_output="Full analysis report in natural language, professional and easy to understand, 800-1000 words.",
+        context=[task1, *completed]
     )
+    result = await _kickoff_async([report_writer], [task3], research_area)
+    return result, failed
 
-    # 7. 创建Crew并运行
-    crew = Crew(
-        agents=[patent_researcher, trend_analyst, report_writer],
-        tasks=[task1, task2, task3],
-        process=Process.sequential,  # 顺序执行任务
-        verbose=True  # 显示详细执行过程
-    )
 
-    # 运行分析（传入全局输入参数）
+class AnalysisReport(str):
+    """最终报告文本；failed_focuses非空表示部分趋势分析子任务失败，报告内容不完整"""
+    failed_focuses = ()
+
+    @property
+    def partial(self) -> bool:
+        return bool(self.failed_focuses)
+
+
+def run_patent_analysis(research_area: str, model_name: str = "deepseek-chat", stream: Optional[TextIO] = None) -> AnalysisReport:
+    """
+    运行专利分析（基于CrewAI agents，使用Ollama模型）
+    stream: 可选的文件对象，执行过程中的Agent步骤会实时写入
+    返回的报告在有趋势分析子任务失败时partial为True，调用方不应缓存
+    """
+    llm = _get_llm(model_name)
+
+    # 运行分析
     print(f"\nStarting {research_area} patent analysis with {model_name} model...")
-    result = crew.kickoff(inputs={"research_area": research_area})
+    on_output = _stream_writer(stream) if stream is not None else None
+    result, failed = asyncio.run(_run_pipeline(research_area, llm, on_output))
+    report = AnalysisReport(_format_report(research_area, model_name, result, failed))
+    report.failed_focuses = tuple(failed)
+    return report
+
 
-    # 格式化结果（确保result是字符串）
-    if not isinstance(result, str):
-        result = str(result)
+def _format_report(research_area: str, model_name: str, result, failed: List[str] = ()) -> str:
+    """把Crew输出包装成最终报告"""
+    # CrewOutput.raw就是最后一个任务的原始文本，避免str()重新序列化整个CrewOutput
+    result_text = getattr(result, "raw", None) or str(result)
+    warning = ""
+    if failed:
+        warning = f"Warning: trend analysis incomplete, failed sub-tasks: {', '.join(failed)}\n"
 
     # 格式化最终报告
     final_report = f"""
@@ -154,10 +269,10 @@ def run_patent_analysis(research_area: str, model_name: str = "deepseek-chat") -
 Generated on: {datetime.now().strftime("%Y-%m-%d %H:%M:%S")}
 Model used: {model_name}
 
-{result}
+{result_text}
 
 ---
-Note: This analysis is based on mock patent data (no real OpenSearch integration).
+{warning}Note: This analysis is based on mock patent data (no real OpenSearch integration).
 For production use, integrate with real patent database/OpenSearch.
 """
 